@@ -5,7 +5,7 @@ package.domain = com.pyremote
 source.dir = .
 source.include_exts = py,png,jpg,kv,atlas
 version = 0.2
-requirements = python3,kivy
+requirements = python3,kivy,pyjnius
 orientation = portrait
 fullscreen = 0
 android.permissions = INTERNET,ACCESS_NETWORK_STATE,ACCESS_WIFI_STATE,CHANGE_WIFI_MULTICAST_STATE,WAKE_LOCK
@@ -8,6 +8,12 @@ import socket
 import threading
 import platform
 import time
+import json
+
+try:
+    from jnius import autoclass, detach
+except ImportError:
+    autoclass = None # Not running on Android (desktop testing)
 
 # ================= 配置区域 (Configuration) =================
 # 如果您需要【不在同一WiFi下】也能自动连接，请修改下方引号内的内容。
@@ -17,6 +23,17 @@ import time
 TARGET_IP = ""  
 # ==========================================================
 
+# Telemetry push intervals (seconds), chosen by battery state
+STATUS_INTERVAL_CHARGING = 5
+STATUS_INTERVAL_NORMAL = 15
+STATUS_INTERVAL_LOW = 60       # battery <= STATUS_LOW_BATTERY
+STATUS_LOW_BATTERY = 20
+STATUS_HEARTBEAT = 60          # Resend unchanged status at least this often
+
+# Backoff (seconds) when the PC connection fails or drops
+RECONNECT_MIN_DELAY = 5
+RECONNECT_MAX_DELAY = 60
+
 class RemoteClient(App):
     def build(self):
         self.layout = BoxLayout(orientation='vertical', padding=50, spacing=20)
@@ -40,6 +57,8 @@ class RemoteClient(App):
 
     def on_start(self):
         self.connected = False
+        self.foreground = True
+        self.status_wakeup = threading.Event()
         # 1. Start LAN Auto Discovery (Always run this in background)
         threading.Thread(target=self.auto_discover, daemon=True).start()
 
@@ -48,6 +67,15 @@ class RemoteClient(App):
             Clock.schedule_once(lambda dt: self.update_status(f"🚀 Connecting to Remote: {TARGET_IP}"))
             threading.Thread(target=self.connect_to_server, args=(TARGET_IP,), daemon=True).start()
 
+    def on_pause(self):
+        self.foreground = False
+        self.status_wakeup.set() # Push foreground change right away
+        return True
+
+    def on_resume(self):
+        self.foreground = True
+        self.status_wakeup.set()
+
     def direct_connect_target(self):
         # Deprecated, merged into on_start
         pass
@@ -99,7 +127,24 @@ class RemoteClient(App):
         threading.Thread(target=self.connect_to_server, args=(ip,), daemon=True).start()
 
     def connect_to_server(self, ip):
-        if self.connected: return
+        # Retry the remote IP, and any server that dropped us, with backoff
+        delay = RECONNECT_MIN_DELAY
+        retry = ip == TARGET_IP
+        while not self.connected:
+            if self.run_session(ip):
+                retry, delay = True, RECONNECT_MIN_DELAY # Dropped, start over
+            elif not retry:
+                return
+            if self.connected: return # Another attempt got through meanwhile
+            Clock.schedule_once(lambda dt, d=delay: self.update_status(f"🔄 Reconnecting to {ip} in {d}s..."))
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    def run_session(self, ip):
+        # Returns True if a connection was made (and has since closed)
+        if self.connected: return False
+        s = None
+        was_connected = False
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             # Timeout for connection attempt
@@ -108,25 +153,118 @@ class RemoteClient(App):
             s.settimeout(None) # Reset timeout for data
             
             self.connected = True # Mark as connected
+            was_connected = True
             
             # Send device info
             info = f"Device: {platform.machine()} | System: {platform.system()}"
-            s.send(info.encode('utf-8'))
+            s.send((info + "\n").encode('utf-8'))
             
             Clock.schedule_once(lambda dt: self.update_status(f"✅ Connected to {ip}!"))
             
+            # Push phone status so the PC can skip its adb polling.
+            # Each session gets its own events, on_pause/on_resume wake the current one
+            stop_status = threading.Event()
+            self.status_wakeup = wake_status = threading.Event()
+            threading.Thread(target=self.status_loop, args=(s, stop_status, wake_status), daemon=True).start()
+            
             # Keep alive loop
-            while True:
-                data = s.recv(1024)
-                if not data: break
+            try:
+                while True:
+                    data = s.recv(1024)
+                    if not data: break
+            finally:
+                stop_status.set()
+                wake_status.set()
         except Exception as e:
-            if not self.connected:
+            if not was_connected:
                 Clock.schedule_once(lambda dt: self.update_status(f"❌ Failed: {str(e)}"))
-                # Retry logic for Remote IP
-                if ip == TARGET_IP and not self.connected:
-                     Clock.schedule_once(lambda dt: self.update_status(f"🔄 Retrying Remote in 5s..."))
-                     time.sleep(5)
-                     self.connect_to_server(ip)
+        finally:
+            if s:
+                try:
+                    s.close()
+                except:
+                    pass
+            if was_connected:
+                self.connected = False
+                Clock.schedule_once(lambda dt: self.update_status(f"⚠️ Disconnected from {ip}"))
+        return was_connected
+
+    def status_loop(self, s, stop, wake):
+        # Sends one JSON line per update: on change, on foreground change,
+        # and as a heartbeat. Interval grows as the battery drains.
+        last, last_sent = None, 0
+        identity = True
+        try:
+            while not stop.is_set():
+                wake.clear() # Before sampling, so a wake-up during it isn't lost
+                status = self.read_device_status(identity=identity)
+                identity = False
+                status["fg"] = 1 if self.foreground else 0
+                now = time.time()
+                if status != last or now - last_sent >= STATUS_HEARTBEAT:
+                    s.send((json.dumps(status, separators=(',', ':')) + "\n").encode('utf-8'))
+                    last, last_sent = dict(status), now
+                wake.wait(self.status_interval(status))
+        except Exception:
+            # Send failed, wake the keep alive recv so it can reconnect
+            try:
+                s.shutdown(socket.SHUT_RDWR)
+            except:
+                pass
+        finally:
+            if autoclass:
+                detach() # Release the JVM attachment of this thread
+
+    def status_interval(self, status):
+        if status.get("chg"):
+            return STATUS_INTERVAL_CHARGING
+        bat = status.get("bat")
+        if bat is not None and bat <= STATUS_LOW_BATTERY:
+            return STATUS_INTERVAL_LOW
+        return STATUS_INTERVAL_NORMAL
+
+    def read_device_status(self, identity=False):
+        # Short keys keep each update to a few dozen bytes
+        status = {}
+        if autoclass is None:
+            return status
+        try:
+            Context = autoclass('android.content.Context')
+            Intent = autoclass('android.content.Intent')
+            IntentFilter = autoclass('android.content.IntentFilter')
+            BatteryManager = autoclass('android.os.BatteryManager')
+            activity = autoclass('org.kivy.android.PythonActivity').mActivity
+
+            if identity:
+                Build = autoclass('android.os.Build')
+                status["model"] = Build.MODEL
+                status["os"] = autoclass('android.os.Build$VERSION').RELEASE
+
+            # Sticky broadcast, no receiver needs to stay registered
+            battery = activity.registerReceiver(None, IntentFilter(Intent.ACTION_BATTERY_CHANGED))
+            if battery:
+                level = battery.getIntExtra(BatteryManager.EXTRA_LEVEL, -1)
+                scale = battery.getIntExtra(BatteryManager.EXTRA_SCALE, 100)
+                if level >= 0 and scale > 0:
+                    status["bat"] = level * 100 // scale
+                status["chg"] = 1 if battery.getIntExtra(BatteryManager.EXTRA_PLUGGED, 0) else 0
+
+            cm = activity.getSystemService(Context.CONNECTIVITY_SERVICE)
+            net = cm.getActiveNetworkInfo()
+            status["net"] = net.getTypeName() if net and net.isConnected() else "NONE"
+            if status["net"] == "WIFI":
+                wm = activity.getApplicationContext().getSystemService(Context.WIFI_SERVICE)
+                status["sig"] = wm.getConnectionInfo().getRssi()
+            elif status["net"] == "MOBILE":
+                try:
+                    # Signal bars 0-4, getSignalStrength() needs API 28+
+                    tm = activity.getSystemService(Context.TELEPHONY_SERVICE)
+                    status["lvl"] = tm.getSignalStrength().getLevel()
+                except Exception:
+                    pass
+        except Exception:
+            pass
+        return status
 
     def update_status(self, msg):
         self.status_lbl.text = msg
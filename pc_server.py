@@ -3,6 +3,8 @@ import os
 import subprocess
 import time
 import threading
+import json
+import re
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QTableWidget, QTableWidgetItem, 
                              QPushButton, QLabel, QHeaderView, QCheckBox, 
@@ -18,6 +20,79 @@ SCRCPY_EXE = os.path.join(SCRCPY_DIR, "scrcpy.exe")
 
 import socket
 
+# Phone status pushed by the client APP is trusted for this long (seconds)
+# after the last update; the client sends a heartbeat at least every 60s.
+TELEMETRY_TTL = 150
+
+# wlan0 address of USB devices, used to match them to client APP connections
+WLAN_IP_CACHE_TTL = 60
+
+# How long to wait for the rest of a split info line before treating the
+# client as an old one that sends the info without a newline
+INFO_LINE_TIMEOUT = 1
+
+# Latest status pushed by each connected client APP, keyed by connection
+# ("ip:port"), so phones sharing a public IP or reconnecting don't collide
+class PhoneTelemetry:
+    IDENTITY_KEYS = ("model", "os") # Only sent once per connection
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.phones = {}
+
+    def update(self, conn, ip, status):
+        with self.lock:
+            old = self.phones.get(conn, {})
+            phone = {k: old[k] for k in self.IDENTITY_KEYS if k in old}
+            phone.update(status)
+            phone.update(conn=conn, ip=ip, updated=time.time())
+            self.phones[conn] = phone
+
+    def remove(self, conn):
+        with self.lock:
+            self.phones.pop(conn, None)
+
+    def snapshot(self):
+        now = time.time()
+        with self.lock:
+            return [dict(p) for p in self.phones.values() if now - p["updated"] < TELEMETRY_TTL]
+
+    @staticmethod
+    def find(phones, ips, model, adb_models, confirm):
+        # Match an adb device to a phone by IP (wireless adb serial or the
+        # device's wlan0 address), then by model only if exactly one adb
+        # device and one phone have it and confirm(phone) agrees.
+        # Ambiguous cases keep adb polling.
+        for ip in ips:
+            same_ip = [p for p in phones if ip and p["ip"] == ip]
+            if len(same_ip) == 1:
+                return same_ip[0]
+        if adb_models.count(model) == 1:
+            same_model = [p for p in phones if PhoneTelemetry.adb_model(p.get("model", "")) == model]
+            if len(same_model) == 1 and confirm(same_model[0]):
+                return same_model[0]
+        return None
+
+    @staticmethod
+    def adb_model(model):
+        # "devices -l" replaces every non-alphanumeric character with "_"
+        return re.sub(r'[^A-Za-z0-9]', '_', model)
+
+    @staticmethod
+    def format_battery(phone):
+        if "bat" not in phone:
+            return "?"
+        return f"{phone['bat']}%" + (" ⚡" if phone.get("chg") else "")
+
+    @staticmethod
+    def format_wifi(phone):
+        net = phone.get("net", "?")
+        if "sig" in phone:
+            return f"{net} {phone['sig']}dBm"
+        if "lvl" in phone:
+            return f"{net} {phone['lvl']}/4"
+        return net
+
 # Worker Thread for Broadcast
 class BroadcastWorker(QThread):
     def run(self):
@@ -34,6 +109,12 @@ class BroadcastWorker(QThread):
 class AdbWorker(QThread):
     devices_updated = pyqtSignal(list)
 
+    def __init__(self, telemetry):
+        super().__init__()
+        self.telemetry = telemetry
+        self.wlan_ips = {} # serial -> (ip, fetched at)
+        self.model_matches = {} # (serial, conn) -> confirmed
+
     def run(self):
         while True:
             devices = self.get_devices()
@@ -61,7 +142,10 @@ class AdbWorker(QThread):
         output = self.run_command(["devices", "-l"])
         lines = output.split('\n')[1:]
         device_list = []
+        phones = self.telemetry.snapshot()
+        matched = set()
         
+        adb_devices = []
         for line in lines:
             if not line.strip():
                 continue
@@ -74,12 +158,40 @@ class AdbWorker(QThread):
             for part in parts:
                 if part.startswith("model:"):
                     model = part.split(":")[1]
-            
-            # Fetch details (simplified for performance)
-            # In a real app, these should be batched or cached
-            battery = self.get_battery(serial) if state == "device" else "?"
-            wifi = self.get_wifi(serial) if state == "device" else "?"
-            android_ver = self.get_android_ver(serial) if state == "device" else "?"
+            adb_devices.append((serial, state, model))
+        adb_models = [model for _, _, model in adb_devices]
+        
+        # Forget confirmations for devices or connections that are gone
+        serials = {serial for serial, _, _ in adb_devices}
+        conns = {p["conn"] for p in phones}
+        for key in list(self.model_matches):
+            if key[0] not in serials or key[1] not in conns:
+                del self.model_matches[key]
+        
+        for serial, state, model in adb_devices:
+            # Phones running the client APP push their own status,
+            # so only poll adb for the rest
+            phone = None
+            if phones:
+                ips = [serial.split(":")[0]]
+                if state == "device" and ":" not in serial:
+                    ips.append(self.get_wlan_ip(serial))
+                phone = PhoneTelemetry.find(phones, ips, model, adb_models,
+                                            lambda p: self.confirm_model_match(serial, p))
+            if phone and phone["conn"] in matched:
+                phone = None
+            if phone:
+                matched.add(phone["conn"])
+            if phone and "bat" in phone:
+                battery = PhoneTelemetry.format_battery(phone)
+                wifi = PhoneTelemetry.format_wifi(phone)
+                android_ver = phone.get("os") or (self.get_android_ver(serial) if state == "device" else "?")
+            else:
+                # Fetch details (simplified for performance)
+                # In a real app, these should be batched or cached
+                battery = self.get_battery(serial) if state == "device" else "?"
+                wifi = self.get_wifi(serial) if state == "device" else "?"
+                android_ver = self.get_android_ver(serial) if state == "device" else "?"
             
             device_list.append({
                 "serial": serial,
@@ -87,7 +199,22 @@ class AdbWorker(QThread):
                 "model": model,
                 "battery": battery,
                 "wifi": wifi,
-                "system": f"Android {android_ver}"
+                "system": f"Android {android_ver}",
+                "foreground": phone.get("fg") if phone else None
+            })
+
+        # Phones only reachable through the client APP connection
+        for phone in phones:
+            if phone["conn"] in matched:
+                continue
+            device_list.append({
+                "serial": f"app:{phone['conn']}",
+                "state": "app",
+                "model": phone.get("model", "Unknown"),
+                "battery": PhoneTelemetry.format_battery(phone),
+                "wifi": PhoneTelemetry.format_wifi(phone),
+                "system": f"Android {phone.get('os', '?')}",
+                "foreground": phone.get("fg")
             })
         return device_list
 
@@ -108,9 +235,38 @@ class AdbWorker(QThread):
     def get_android_ver(self, serial):
         return self.run_command(["-s", serial, "shell", "getprop", "ro.build.version.release"])
 
+    def confirm_model_match(self, serial, phone):
+        # Same model alone doesn't prove it's the same phone. Compare details
+        # adb can read too, once per device/connection pair.
+        key = (serial, phone["conn"])
+        if key not in self.model_matches:
+            confirmed = False
+            if "bat" in phone and phone.get("os") == self.get_android_ver(serial):
+                level = self.get_battery(serial).rstrip("%")
+                confirmed = level.isdigit() and abs(int(level) - phone["bat"]) <= 1
+            self.model_matches[key] = confirmed
+        return self.model_matches[key]
+
+    def get_wlan_ip(self, serial):
+        cached = self.wlan_ips.get(serial)
+        if cached and time.time() - cached[1] < WLAN_IP_CACHE_TTL:
+            return cached[0]
+        out = self.run_command(["-s", serial, "shell", "ip", "-f", "inet", "addr", "show", "wlan0"])
+        ip = None
+        for line in out.split('\n'):
+            line = line.strip()
+            if line.startswith("inet "):
+                ip = line.split()[1].split("/")[0]
+        self.wlan_ips[serial] = (ip, time.time())
+        return ip
+
 class ServerWorker(QThread):
     client_connected = pyqtSignal(str, str) # ip, info
 
+    def __init__(self, telemetry):
+        super().__init__()
+        self.telemetry = telemetry
+
     def run(self):
         server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server.bind(('0.0.0.0', 9999))
@@ -119,12 +275,57 @@ class ServerWorker(QThread):
         
         while True:
             client, addr = server.accept()
-            ip = addr[0]
+            threading.Thread(target=self.handle_client, args=(client, addr), daemon=True).start()
+
+    def handle_client(self, client, addr):
+        # First line is the device info, every following line is a JSON status
+        # update. Older clients send only the info without a newline.
+        ip = addr[0]
+        conn = f"{addr[0]}:{addr[1]}"
+        reporting = False
+        try:
+            buffer = client.recv(1024)
+            if not buffer:
+                return
+            # The info line may arrive split across reads, wait briefly for its end
+            client.settimeout(INFO_LINE_TIMEOUT)
             try:
-                data = client.recv(1024).decode('utf-8')
-                self.client_connected.emit(ip, data)
-            except:
+                while b"\n" not in buffer:
+                    data = client.recv(1024)
+                    if not data:
+                        break
+                    buffer += data
+            except socket.timeout:
                 pass
+            client.settimeout(None)
+            info, _, buffer = buffer.partition(b"\n")
+            self.client_connected.emit(ip, info.decode('utf-8', 'replace'))
+            
+            while True:
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        try:
+                            status = json.loads(line)
+                        except ValueError:
+                            continue
+                        if not isinstance(status, dict):
+                            continue
+                        self.telemetry.update(conn, ip, status)
+                        if not reporting:
+                            # Drop phones that stop reporting; info-only
+                            # clients keep a blocking socket as before
+                            client.settimeout(TELEMETRY_TTL)
+                            reporting = True
+                data = client.recv(1024)
+                if not data:
+                    break
+                buffer += data
+        except:
+            pass
+        finally:
+            self.telemetry.remove(conn)
+            client.close()
 
 class DeviceManager(QMainWindow):
     def __init__(self):
@@ -134,10 +335,12 @@ class DeviceManager(QMainWindow):
         self.setup_style()
 
         self.devices = []
+        self.telemetry = PhoneTelemetry()
+        self.known_clients = set() # (ip, info) already announced
         self.setup_ui()
         
         # Start Server for Custom APK
-        self.server_worker = ServerWorker()
+        self.server_worker = ServerWorker(self.telemetry)
         self.server_worker.client_connected.connect(self.on_client_connect)
         self.server_worker.start()
 
@@ -149,7 +352,7 @@ class DeviceManager(QMainWindow):
         self.setAcceptDrops(True)
         
         # Start Worker
-        self.worker = AdbWorker()
+        self.worker = AdbWorker(self.telemetry)
         self.worker.devices_updated.connect(self.update_device_list)
         self.worker.start()
 
@@ -334,7 +537,10 @@ class DeviceManager(QMainWindow):
             # Checkbox
             check_item = QTableWidgetItem()
             check_item.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-            if device["serial"] in checked_serials or not checked_serials: # Default check new ones if list was empty
+            if device["state"] == "app": # No adb access, cannot launch or install
+                check_item.setFlags(Qt.ItemFlag.ItemIsEnabled)
+                check_item.setCheckState(Qt.CheckState.Unchecked)
+            elif device["serial"] in checked_serials or not checked_serials: # Default check new ones if list was empty
                 check_item.setCheckState(Qt.CheckState.Checked)
             else:
                 check_item.setCheckState(Qt.CheckState.Unchecked)
@@ -345,7 +551,10 @@ class DeviceManager(QMainWindow):
             self.table.setItem(i, 3, QTableWidgetItem(device["wifi"]))
             self.table.setItem(i, 4, QTableWidgetItem(device["model"]))
             self.table.setItem(i, 5, QTableWidgetItem(device["system"]))
-            self.table.setItem(i, 6, QTableWidgetItem(device["state"]))
+            state = device["state"]
+            if device["foreground"] is not None:
+                state += " | APP前台" if device["foreground"] else " | APP后台"
+            self.table.setItem(i, 6, QTableWidgetItem(state))
 
     def launch_selected(self):
         for i in range(self.table.rowCount()):
@@ -465,6 +674,10 @@ class DeviceManager(QMainWindow):
 
     def on_client_connect(self, ip, info):
         self.status_bar.showMessage(f"📱 新客户端接入: {ip} - {info}")
+        # Clients reconnect on their own after drops, only announce new ones
+        if (ip, info) in self.known_clients:
+            return
+        self.known_clients.add((ip, info))
         QMessageBox.information(self, "新设备接入", f"检测到手机端 APP 连接！\nIP: {ip}\nInfo: {info}")
 
     def show_pair_dialog(self):